@@ -1,8 +1,204 @@
 from copy import deepcopy
 from typing import *
+import time
+from itertools import groupby, islice
+from operator import itemgetter
 import xml.etree.ElementTree as ElementTree
 import xml.dom.minidom as minidom
 
+"""
+    Exceção lançada quando uma operação é interrompida antes de terminar. Ela carrega as estatísticas
+    parciais da operação (estados criados, pares examinados, tempo decorrido e etapa), para que quem
+    chamou saiba até onde a operação chegou.
+"""
+class OperacaoInterrompida(Exception):
+    def __init__(self, mensagem: str, estatisticas: Dict[str, Any]):
+        super().__init__(mensagem)
+        self.estatisticas = estatisticas
+
+# Lançada quando algum dos limites do orçamento (estados, pares ou prazo) é ultrapassado
+class LimiteExcedido(OperacaoInterrompida):
+    pass
+
+# Lançada quando a função de progresso pede o cancelamento da operação (retornando False)
+class OperacaoCancelada(OperacaoInterrompida):
+    pass
+
+"""
+    Classe para limitar os recursos usados pelas operações que podem crescer demais: produto (união,
+    interseção, diferença e xor), complemento, equivalência e minimização. Todos os limites são
+    opcionais:
+        - max_estados: quantidade máxima de estados criados;
+        - max_pares: quantidade máxima de pares de estados examinados;
+        - prazo: tempo máximo, em segundos, contado a partir da criação do orçamento;
+        - progresso: função chamada a cada `intervalo` passos com as estatísticas parciais. Se ela
+          retornar False, a operação é cancelada.
+    O mesmo orçamento pode ser passado para várias operações seguidas, acumulando as contagens.
+"""
+class Orcamento:
+    def __init__(self,
+                 max_estados: int | None = None,
+                 max_pares: int | None = None,
+                 prazo: float | None = None,
+                 progresso: Callable[[Dict[str, Any]], Any] | None = None,
+                 intervalo: int = 1000):
+
+        self.max_estados = max_estados
+        self.max_pares = max_pares
+        self.progresso = progresso
+        self.intervalo = intervalo
+        self.inicio = time.monotonic()
+        self.limite_tempo = None if prazo is None else self.inicio + prazo
+
+        self.etapa = None
+        self.estados = 0
+        self.pares = 0
+        self.passos = 0
+
+    def estatisticas (self) -> Dict[str, Any]:
+        return {
+            "etapa": self.etapa,
+            "estados": self.estados,
+            "pares": self.pares,
+            "tempo": time.monotonic() - self.inicio,
+        }
+
+    def contar_estados (self, quantidade: int = 1):
+        self.estados += quantidade
+        if self.max_estados is not None and self.estados > self.max_estados:
+            raise LimiteExcedido(f"Limite de {self.max_estados} estados excedido em {self.etapa}.", self.estatisticas())
+        self.verificar()
+
+    def contar_pares (self, quantidade: int = 1):
+        self.pares += quantidade
+        if self.max_pares is not None and self.pares > self.max_pares:
+            raise LimiteExcedido(f"Limite de {self.max_pares} pares excedido em {self.etapa}.", self.estatisticas())
+        self.verificar()
+
+    """
+        Método chamado a cada passo das operações. O prazo e a função de progresso só são
+        consultados a cada `intervalo` passos, para não pesar nos laços internos.
+    """
+    def verificar (self):
+        self.passos += 1
+        if self.passos % self.intervalo != 0:
+            return
+
+        if self.limite_tempo is not None and time.monotonic() > self.limite_tempo:
+            raise LimiteExcedido(f"Prazo excedido em {self.etapa}.", self.estatisticas())
+
+        if self.progresso is not None and self.progresso(self.estatisticas()) is False:
+            raise OperacaoCancelada(f"Operação cancelada em {self.etapa}.", self.estatisticas())
+
+"""
+    Classe da árvore de prefixos (trie) usada para filtrar listas grandes de palavras em um AFD. Cada nó
+    guarda seus filhos (símbolo: nó), quantas palavras terminam nele, quantas palavras passam por ele, a
+    soma dos símbolos que ainda faltam ler nessas palavras a partir dele e uma das palavras que passam por
+    ele (cujo prefixo é o caminho até o nó). Essas contagens permitem comparar o percurso conjunto com a
+    validação palavra por palavra sem precisar repeti-la.
+
+    Quando só uma palavra passa por um filho, ele não vira um nó: a própria palavra é guardada no lugar
+    dele. Os nós só são criados quando uma segunda palavra compartilha o caminho, então as partes não
+    compartilhadas (como o final de URLs longas) não viram um nó por caractere.
+"""
+class Trie:
+    __slots__ = ("filhos", "finais", "palavras", "restante", "palavra")
+
+    def __init__(self):
+        self.filhos: Dict[str, Trie | str] = {}
+        self.finais = 0
+        self.palavras = 0
+        self.restante = 0
+        self.palavra: str | None = None
+
+    """
+        Monta a trie de uma vez a partir da lista ordenada: as palavras de cada nó são agrupadas pelo
+        próximo símbolo com o groupby, então o trabalho por caractere fica em C e o Python só trabalha
+        uma vez por nó. O resultado é o mesmo de adicionar as palavras uma a uma.
+    """
+    @classmethod
+    def montar (cls, palavras: Iterable[str]):
+        trie = cls()
+        pilha = [(trie, sorted(palavras), 0)]
+
+        while pilha:
+            no, grupo, profundidade = pilha.pop()
+            if not grupo:
+                continue
+
+            no.palavras = len(grupo)
+            no.restante = sum(map(len, grupo)) - profundidade * len(grupo)
+            no.palavra = grupo[0]
+
+            # As palavras que terminam aqui são iguais e vêm primeiro na ordem
+            finais = 0
+            while finais < len(grupo) and len(grupo[finais]) == profundidade:
+                finais += 1
+            no.finais = finais
+
+            for simbolo, filhas in groupby(islice(grupo, finais, None), itemgetter(profundidade)):
+                filhas = list(filhas)
+                if len(filhas) == 1:
+                    no.filhos[simbolo] = filhas[0]
+                else:
+                    filho = cls()
+                    no.filhos[simbolo] = filho
+                    pilha.append((filho, filhas, profundidade + 1))
+
+        return trie
+
+    def adicionar (self, palavra: str):
+        no = self
+        tamanho = len(palavra)
+        profundidade = 0
+
+        while True:
+            no.palavras += 1
+            no.restante += tamanho - profundidade
+            if no.palavra is None:
+                no.palavra = palavra
+
+            if profundidade == tamanho:
+                no.finais += 1
+                return
+
+            simbolo = palavra[profundidade]
+            filho = no.filhos.get(simbolo)
+            if filho is None:
+                no.filhos[simbolo] = palavra
+                return
+
+            # Uma palavra guardada direto vira um nó quando outra palavra chega nela
+            if isinstance(filho, str):
+                filho = Trie.expandir(filho, profundidade + 1)
+                no.filhos[simbolo] = filho
+
+            no = filho
+            profundidade += 1
+
+    @staticmethod
+    def expandir (palavra: str, profundidade: int):
+        no = Trie()
+        no.palavras = 1
+        no.restante = len(palavra) - profundidade
+        no.palavra = palavra
+
+        if len(palavra) == profundidade:
+            no.finais = 1
+        else:
+            no.filhos[palavra[profundidade]] = palavra
+
+        return no
+
+"""
+    Classe com as transições de um AFD rotuladas por classe de símbolos, retornada por
+    AFD.transicoes_por_classe. Os grupos são da forma id_da_classe: [símbolos] (veja agrupar_classes),
+    e a tabela, da forma (estado, id_da_classe): destino.
+"""
+class TabelaDeClasses(NamedTuple):
+    grupos: Dict[int, List[str]]
+    tabela: Dict[Tuple[str, int], str]
+
 class AFD:
     def __init__(self,
                  estados: Iterable[str],
@@ -50,6 +246,90 @@ class AFD:
     def copiar (self):
         return deepcopy(self)
 
+    """
+        Método para agrupar os símbolos do alfabeto em classes de equivalência: dois símbolos ficam na
+        mesma classe se, em todos os estados, levam ao mesmo destino (ou a nenhum). Assim, os algoritmos
+        podem processar um único símbolo representante por classe em vez de todo o alfabeto (os
+        autômatos gerados, porém, continuam com uma transição por símbolo). Se outros
+        autômatos forem passados, as classes valem para todos eles ao mesmo tempo (útil no produto).
+        Como a assinatura também diz se o símbolo pertence ao alfabeto de cada autômato, as classes
+        continuam valendo depois de completar os autômatos.
+        O retorno é um dicionário da forma simbolo: id_da_classe.
+    """
+    def classes_de_simbolos (self, *outros, orcamento: Orcamento | None = None) -> Dict[str, int]:
+        automatos = (self,) + outros
+        simbolos = set().union(*(afd.alfabeto for afd in automatos))
+        estados = [(afd, sorted(afd.estados)) for afd in automatos]
+
+        assinatura_classe = {}
+        classes = {}
+        for simbolo in sorted(simbolos):
+            if orcamento is not None:
+                orcamento.verificar()
+
+            # A assinatura de um símbolo é a lista de destinos dele em cada estado
+            assinatura = tuple(afd.transicoes.get((estado, simbolo)) for afd, lista in estados for estado in lista)
+            assinatura += tuple(simbolo in afd.alfabeto for afd in automatos)
+            if assinatura not in assinatura_classe:
+                assinatura_classe[assinatura] = len(assinatura_classe)
+            classes[simbolo] = assinatura_classe[assinatura]
+
+        return classes
+
+    """
+        Método para inverter o dicionário de classes, gerando id_da_classe: [símbolos]. Os símbolos
+        de cada classe ficam ordenados, então o primeiro deles é usado como representante.
+    """
+    @staticmethod
+    def agrupar_classes (classes: Dict[str, int]) -> Dict[int, List[str]]:
+        grupos = {}
+        for simbolo in sorted(classes):
+            grupos.setdefault(classes[simbolo], []).append(simbolo)
+
+        return grupos
+
+    """
+        Método para descrever um conjunto de símbolos como intervalos de code points, por exemplo
+        ['a', 'b', 'c', 'x'] vira [('a', 'c'), ('x', 'x')]. Símbolos com mais de um caractere
+        ficam em intervalos próprios.
+    """
+    @staticmethod
+    def intervalos_de_simbolos (simbolos: Iterable[str]) -> List[Tuple[str, str]]:
+        intervalos = []
+        for simbolo in sorted(simbolos):
+            if intervalos and len(simbolo) == 1 and len(intervalos[-1][1]) == 1 and ord(simbolo) == ord(intervalos[-1][1]) + 1:
+                intervalos[-1] = (intervalos[-1][0], simbolo)
+            else:
+                intervalos.append((simbolo, simbolo))
+
+        return intervalos
+
+    """
+        Método para gerar as transições rotuladas por classe de símbolos: em vez de uma transição por
+        símbolo, há uma por classe, na forma (estado, id_da_classe): destino. Os grupos de classes
+        (id_da_classe: [símbolos]) podem ser passados já calculados, por exemplo as classes conjuntas de
+        dois autômatos no produto; caso contrário, são calculados aqui. Os intervalos de code points de
+        uma classe são dados por intervalos_de_simbolos(grupos[id_da_classe]).
+
+        O retorno, uma TabelaDeClasses, é o que os algoritmos de minimizar e estados equivalentes
+        recebem no parâmetro "tabela_de_classes", para que as classes sejam calculadas uma única vez.
+    """
+    def transicoes_por_classe (self, grupos: Dict[int, List[str]] | None = None, orcamento: Orcamento | None = None) -> TabelaDeClasses:
+        if grupos is None:
+            grupos = AFD.agrupar_classes(self.classes_de_simbolos(orcamento=orcamento))
+
+        tabela = {}
+        for estado in self.estados:
+            for id_classe, simbolos in grupos.items():
+                if orcamento is not None:
+                    orcamento.verificar()
+
+                destino = self.transicoes.get((estado, simbolos[0]))
+                if destino is not None:
+                    tabela[(estado, id_classe)] = destino
+
+        return TabelaDeClasses(grupos, tabela)
+
     """
         Função para verificar se uma certa cadeia de caracteres é aceita no autômato. Caso o úl-
         timo estado a ser passado seja um estado final, a cadeia é válida, caso contrário, não é.
@@ -66,6 +346,137 @@ class AFD:
 
         return estado_atual in self.estados_finais # Retorna se o estado está no conjunto de estados finais
 
+    """
+        Método para filtrar várias palavras de uma vez, percorrendo juntos uma trie com as palavras e o
+        AFD. Assim, cada prefixo compartilhado é processado uma única vez, e subárvores inteiras são
+        descartadas assim que falta uma transição ou o autômato cai em um estado morto (que não leva a
+        nenhum estado final). As palavras aceitas são devolvidas aos poucos (gerador), na ordem da trie,
+        e repetidas tantas vezes quanto aparecem na entrada.
+
+        Montar a trie custa mais do que percorrê-la. Para filtrar a mesma lista em vários autômatos
+        (ou várias vezes), vale montá-la uma vez com Trie.montar e passar a trie pronta.
+
+        Se um dicionário de estatísticas for passado, ele é preenchido no final do percurso (ou quando o
+        gerador é interrompido) com:
+            - transicoes: transições feitas no percurso conjunto;
+            - transicoes_validar: transições que o validar faria palavra por palavra, contando também a
+              busca que falha quando falta uma transição. Como o validar continua lendo depois de cair
+              em um estado morto, as subárvores podadas por estado morto são percorridas até onde ele
+              pararia (isso só é feito quando o dicionário é passado);
+            - transicoes_evitadas: diferença entre as duas anteriores;
+            - podas: quantidade de subárvores descartadas.
+    """
+    def filtrar_palavras (self, palavras: Iterable[str] | Trie, estatisticas: Dict[str, int] | None = None) -> Iterator[str]:
+        trie = palavras if isinstance(palavras, Trie) else Trie.montar(palavras)
+        vivos = self.obter_estados_coalcancaveis()
+        finais = self.estados_finais
+
+        # Tabela só com as transições que levam a estados vivos: uma única busca
+        # já diz se a subárvore deve ser descartada
+        transicoes = self.transicoes
+        vivas = {chave: destino for chave, destino in transicoes.items() if destino in vivos}
+
+        # As contagens ficam em variáveis locais e só são escritas no dicionário no final
+        contar = estatisticas is not None
+        feitas = 0
+        validar = 0
+        podas = 0
+
+        try:
+            if self.estado_inicial not in vivos:
+                validar = self.passos_do_validar(trie, self.estado_inicial, 0) if contar else 0
+                podas = 1
+                return
+
+            pilha = [(trie, self.estado_inicial, 0)]
+            while pilha:
+                no, estado, profundidade = pilha.pop()
+
+                if no.finais and estado in finais:
+                    for _ in range(no.finais):
+                        yield no.palavra[:profundidade]
+
+                # Uma transição no percurso conjunto equivale a uma transição
+                # por palavra que passa por essa aresta no validar
+                feitas += len(no.filhos)
+                validar += no.palavras - no.finais
+                profundidade += 1
+
+                for simbolo, filho in no.filhos.items():
+                    destino = vivas.get((estado, simbolo))
+
+                    if destino is None:
+                        podas += 1
+                        if contar and (estado, simbolo) in transicoes: # Estado morto, o validar continuaria
+                            validar += self.passos_do_validar(filho, transicoes[(estado, simbolo)], profundidade)
+
+                    elif isinstance(filho, str):
+                        # Só uma palavra segue por aqui: o resto dela é lido direto, como no validar
+                        cauda = filho[profundidade:]
+                        estado_atual = destino
+                        for caractere in cauda:
+                            estado_atual = vivas.get((estado_atual, caractere))
+                            if estado_atual is None:
+                                break
+                        else:
+                            feitas += len(cauda)
+                            validar += len(cauda)
+                            if estado_atual in finais:
+                                yield filho
+                            continue
+
+                        if not contar:
+                            continue
+
+                        # A palavra foi descartada: o trecho lido é refeito só para as contagens
+                        lidos = 0
+                        while (destino, cauda[lidos]) in vivas:
+                            destino = vivas[(destino, cauda[lidos])]
+                            lidos += 1
+
+                        feitas += lidos + 1 # Conta também a tentativa que falhou
+                        validar += lidos + 1
+                        podas += 1
+                        if (destino, cauda[lidos]) in transicoes: # Estado morto, o validar continuaria
+                            validar += self.passos_do_validar(filho, transicoes[(destino, cauda[lidos])], profundidade + lidos + 1)
+
+                    else:
+                        pilha.append((filho, destino, profundidade))
+        finally:
+            if estatisticas is not None:
+                estatisticas.update(transicoes=feitas, transicoes_validar=validar,
+                                    transicoes_evitadas=validar - feitas, podas=podas)
+
+    """
+        Método para contar quantas transições o validar faria nas palavras de uma subárvore da trie (um
+        nó ou uma palavra guardada direto), a partir do estado em que o AFD está ao chegar nela, com a
+        profundidade sendo quantos símbolos já foram lidos. A busca que falha quando falta uma transição
+        também é contada, e a palavra para ali, como no validar.
+    """
+    def passos_do_validar (self, no: Trie | str, estado: str, profundidade: int) -> int:
+        transicoes = self.transicoes
+        total = 0
+
+        pilha = [(no, estado, profundidade)]
+        while pilha:
+            no, estado, profundidade = pilha.pop()
+
+            if isinstance(no, str):
+                for simbolo in no[profundidade:]:
+                    total += 1
+                    estado = transicoes.get((estado, simbolo))
+                    if estado is None:
+                        break
+                continue
+
+            for simbolo, filho in no.filhos.items():
+                total += 1 if isinstance(filho, str) else filho.palavras
+                destino = transicoes.get((estado, simbolo))
+                if destino is not None:
+                    pilha.append((filho, destino, profundidade + 1))
+
+        return total
+
     """
         Método para importar um arquivo JFLAP para o programa. Ele usa a biblioteca de leitura de XML
         do Python e mapeia cada tag do arquivo formando uma instância da classe AFD no final.
@@ -175,29 +586,68 @@ class AFD:
         with open(arquivo, 'w', encoding='utf-8') as f:
             f.write(arquivo_formatado)
 
+    """
+        Métodos para converter o autômato de e para um dicionário simples (só listas e strings), que pode
+        ser gravado em JSON. Diferente do JFLAP, esse formato guarda também os símbolos do alfabeto que não
+        aparecem em nenhuma transição.
+    """
+    def para_dicionario (self) -> Dict[str, Any]:
+        return {
+            "estados": sorted(self.estados),
+            "alfabeto": sorted(self.alfabeto),
+            "transicoes": [[origem, simbolo, destino] for (origem, simbolo), destino in self.transicoes.items()],
+            "estado_inicial": self.estado_inicial,
+            "estados_finais": sorted(self.estados_finais),
+        }
+
+    @classmethod
+    def de_dicionario (cls, dados: Dict[str, Any]):
+        transicoes = {(origem, simbolo): destino for origem, simbolo, destino in dados["transicoes"]}
+        return cls(dados["estados"], dados["alfabeto"], transicoes, dados["estado_inicial"], dados["estados_finais"])
+
     """
         Método para completar um autômato. Este método é necessário para a minimização do AFD, uma vez que
         se nem todas as transições estão no AFD, logo o cálculo de estados equivalentes é falho.
+
+        O resultado é um AFD novo, montado pelo construtor, que já copia os conjuntos e o dicionário de
+        transições. Como estados e símbolos são strings, isso basta para que ele seja independente do
+        original, sem o custo do deepcopy. Essa cópia é feita de uma vez (em C) e não é interrompida pelo
+        orçamento; as transições que faltam são criadas aos poucos, verificando o orçamento.
     """
-    def completar (self):
-        afd = AFD.copiar(self)
+    def completar (self, orcamento: Orcamento | None = None, grupos: Dict[int, List[str]] | None = None):
+        afd = AFD(self.estados, self.alfabeto, self.transicoes, self.estado_inicial, self.estados_finais)
         adicionou_erro = False
 
+        # Símbolos da mesma classe faltam nos mesmos estados, então basta
+        # testar o representante de cada classe
+        if grupos is None:
+            grupos = AFD.agrupar_classes(self.classes_de_simbolos(orcamento=orcamento))
+        grupos_do_alfabeto = [simbolos for simbolos in grupos.values() if simbolos[0] in afd.alfabeto]
+
         erro = 'ERRO'
-        if erro not in afd.estados:
+        criou_erro = erro not in afd.estados
+        if criou_erro:
             afd.estados.add(erro)
 
         for estado in list(afd.estados):
-            for simbolo in afd.alfabeto:
-                if (estado, simbolo) not in afd.transicoes:
-                    afd.transicoes[(estado, simbolo)] = erro
+            for simbolos in grupos_do_alfabeto:
+                if orcamento is not None:
+                    orcamento.verificar()
+
+                if (estado, simbolos[0]) not in afd.transicoes:
+                    for simbolo in simbolos:
+                        afd.transicoes[(estado, simbolo)] = erro
                     adicionou_erro = True
 
         if adicionou_erro:
+            if orcamento is not None and erro not in self.estados:
+                orcamento.contar_estados()
+
             for simbolo in afd.alfabeto:
                 afd.transicoes[(erro, simbolo)] = erro
 
-        if not adicionou_erro:
+        # Só retiramos o estado de erro se fomos nós que o criamos
+        if not adicionou_erro and criou_erro:
             afd.estados.remove(erro)
 
         return afd
@@ -206,9 +656,12 @@ class AFD:
         Método para gerar o complemento do AFD atual. Faz-se a seguinte alteração: se o estado é final,
         logo, ele não é mais. Se ele não é, logo, agora é.
     """
-    def complemento (self):
-        complemento = AFD.copiar(self)
-        complemento = AFD.completar(complemento)
+    def complemento (self, orcamento: Orcamento | None = None):
+        if orcamento is not None:
+            orcamento.etapa = "complemento"
+
+        # O completar já devolve um AFD novo, então não é preciso copiar antes
+        complemento = AFD.completar(self, orcamento)
 
         for e in complemento.estados:
             if e not in complemento.estados_finais:
@@ -220,51 +673,73 @@ class AFD:
 
     """
         Funções para realizar o produto de dois autômatos seguindo alguma regra. Essa regra pode ser a
-        união, interseção, diferença ou o xor dos dois AFDs. Primeiro, fazemos o produto dos estados,
-        eles são armazenados em um dicionário da forma (e1, e2): nome_e1_e2, para que depois se possa
-        gerar os estados do novo autômato.
+        união, interseção, diferença ou o xor dos dois AFDs. Primeiro, gera-se o produto dos alfabetos
+        dos autômatos, consistindo na união dos dois.
         
-        Depois, gera-se o produto dos alfabetos dos autômatos, consistindo na união dos dois.
+        Depois, partindo do par de estados iniciais, fazemos o produto dos estados alcançáveis: eles são
+        armazenados em um dicionário da forma (e1, e2): nome_e1_e2, para que depois se possa gerar os
+        estados do novo autômato. Pares que nunca são alcançados não entram no produto.
         
-        Assim, geramos as transições. Para isso ocorrer, a transição deve acontecer nos dois
-        AFDs simultaneamente: aqui não criamos o estado de erro como na função de completar,
-        portanto, as transições devem existir em ambos os casos. Dessa forma, pegamos o nome do estado da
-        transição no dicionário de produtos de estados que criamos. Se o estado de destino existir
-        no dicionário (do jeito que a função está montada, acredito que é bem difícil ele não existir),
-        adicionamos ele no dicionário de novas transições.
+        Ao mesmo tempo, geramos as transições. Para isso ocorrer, a transição deve acontecer nos dois
+        AFDs simultaneamente, portanto, as transições devem existir em ambos os casos. Dessa forma, o
+        par de destinos vira um novo estado do produto (caso ainda não exista) e a transição é adicionada
+        no dicionário de novas transições.
         
-        Definimos, então, o novo estado inicial e por fim selecionamos os novos estados finais baseados
-        na operação que é passada por parâmetro e retornamos o novo AFD.
+        Definimos, então, o novo estado inicial e por fim as funções específicas selecionam os novos
+        estados finais baseados na operação desejada. Essas funções, por padrão, aparam os operandos
+        antes do produto (veja o método aparar), para que estados inúteis não sejam multiplicados.
     """
-    def produto (self, other):
+    def produto (self, other, orcamento: Orcamento | None = None):
+        if orcamento is not None:
+            orcamento.etapa = "produto"
+
+        # Símbolos que se comportam igual nos dois AFDs levam ao mesmo par de destinos,
+        # então basta calcular a transição de cada classe. As classes são calculadas uma
+        # única vez e continuam valendo depois de completar os AFDs.
+        grupos = AFD.agrupar_classes(self.classes_de_simbolos(other, orcamento=orcamento))
+
         # Precisamos completar os AFDs para garantir que todas as transições
         # são cobertas no produto dos dois.
-        afd1 = AFD.copiar(self)
-        afd1 = AFD.completar(afd1)
-        afd2 = AFD.copiar(other)
-        afd2 = AFD.completar(afd2)
-
-        produto_estados = {}
-        for estado_afd1 in afd1.estados:
-            for estado_afd2 in afd2.estados:
-                nome_estado = f"{estado_afd1}_{estado_afd2}"
-                produto_estados[(estado_afd1, estado_afd2)] = nome_estado
+        afd1 = AFD.completar(self, orcamento, grupos)
+        afd2 = AFD.completar(other, orcamento, grupos)
+        tabela1 = afd1.transicoes_por_classe(grupos, orcamento).tabela
+        tabela2 = afd2.transicoes_por_classe(grupos, orcamento).tabela
 
         produto_alfabetos = afd1.alfabeto.union(afd2.alfabeto)
 
+        # Em vez de gerar todos os pares possíveis de estados, geramos somente os pares
+        # alcançáveis a partir do par inicial, assim o produto cresce de acordo com a parte
+        # útil de cada autômato.
+        par_inicial = (afd1.estado_inicial, afd2.estado_inicial)
+        produto_estados = {par_inicial: f"{afd1.estado_inicial}_{afd2.estado_inicial}"}
+        pilha = [par_inicial]
+        if orcamento is not None:
+            orcamento.contar_estados()
+
         produto_transicoes = {}
-        for (estado_afd1, estado_afd2), nome_estado_atual in produto_estados.items():
-            for simbolo in produto_alfabetos:
-                destino_afd1 = afd1.transicoes.get((estado_afd1, simbolo))
-                destino_afd2 = afd2.transicoes.get((estado_afd2, simbolo))
+        while pilha:
+            estado_afd1, estado_afd2 = pilha.pop()
+            nome_estado_atual = produto_estados[(estado_afd1, estado_afd2)]
+
+            for id_classe, simbolos in grupos.items():
+                destino_afd1 = tabela1.get((estado_afd1, id_classe))
+                destino_afd2 = tabela2.get((estado_afd2, id_classe))
 
                 # Se as duas transições não levarem a None, juntamos elas
                 if destino_afd1 is not None and destino_afd2 is not None:
-                    estado_destino = produto_estados.get((estado_afd1, estado_afd2))
-                    if estado_destino is not None:
-                        produto_transicoes[(nome_estado_atual, simbolo)] = estado_destino
+                    par_destino = (destino_afd1, destino_afd2)
+                    if par_destino not in produto_estados:
+                        produto_estados[par_destino] = f"{destino_afd1}_{destino_afd2}"
+                        pilha.append(par_destino)
+                        if orcamento is not None:
+                            orcamento.contar_estados()
+
+                    # O AFD guarda uma transição por símbolo, então a saída do produto continua
+                    # proporcional a pares x símbolos; as classes só poupam as consultas
+                    for simbolo in simbolos:
+                        produto_transicoes[(nome_estado_atual, simbolo)] = produto_estados[par_destino]
 
-        produto_estado_inicial = produto_estados[(afd1.estado_inicial, afd2.estado_inicial)]
+        produto_estado_inicial = produto_estados[par_inicial]
 
         nomes_estados = set(produto_estados.values())
 
@@ -272,11 +747,16 @@ class AFD:
         # possam tratá-los de maneira adequada.
         return produto_estados, nomes_estados, produto_alfabetos, produto_transicoes, produto_estado_inicial
 
-    def intersecao (self, other):
-        afd1 = AFD.copiar(self)
-        afd2 = AFD.copiar(other)
+    def intersecao (self, other, aparar: bool = True, orcamento: Orcamento | None = None):
+        if orcamento is not None:
+            orcamento.etapa = "produto"
+
+        # Os operandos não são alterados (o produto trabalha sobre cópias completadas),
+        # então não é preciso copiá-los quando não são aparados
+        afd1 = AFD.aparar(self, orcamento) if aparar else self
+        afd2 = AFD.aparar(other, orcamento) if aparar else other
 
-        estados, nomes_estados, alfabeto, transicoes, estado_inicial = AFD.produto(afd1, afd2)
+        estados, nomes_estados, alfabeto, transicoes, estado_inicial = AFD.produto(afd1, afd2, orcamento)
 
         # Definindo os estados finais para montar o AFD
         produto_estados_finais = set()
@@ -291,12 +771,17 @@ class AFD:
         # Retornando o AFD montado
         return AFD(nomes_estados, alfabeto, transicoes, estado_inicial, produto_estados_finais)
 
-    def diferenca(self, other):
-        afd1 = AFD.copiar(self)
-        afd2 = AFD.copiar(other)
-        afd2 = afd2.complemento()
+    def diferenca (self, other, aparar: bool = True, orcamento: Orcamento | None = None):
+        if orcamento is not None:
+            orcamento.etapa = "produto"
 
-        estados, nomes_estados, alfabeto, transicoes, estado_inicial = AFD.produto(afd1, afd2)
+        # Os operandos não são alterados (o produto trabalha sobre cópias completadas),
+        # então não é preciso copiá-los quando não são aparados
+        afd1 = AFD.aparar(self, orcamento) if aparar else self
+        afd2 = AFD.aparar(other, orcamento) if aparar else other
+        afd2 = afd2.complemento(orcamento)
+
+        estados, nomes_estados, alfabeto, transicoes, estado_inicial = AFD.produto(afd1, afd2, orcamento)
 
         # Definindo os estados finais para montar o AFD
         produto_estados_finais = set()
@@ -311,11 +796,16 @@ class AFD:
         # Retornando o AFD montado
         return AFD(nomes_estados, alfabeto, transicoes, estado_inicial, produto_estados_finais)
 
-    def xor(self, other):
-        afd1 = AFD.copiar(self)
-        afd2 = AFD.copiar(other)
+    def xor (self, other, aparar: bool = True, orcamento: Orcamento | None = None):
+        if orcamento is not None:
+            orcamento.etapa = "produto"
+
+        # Os operandos não são alterados (o produto trabalha sobre cópias completadas),
+        # então não é preciso copiá-los quando não são aparados
+        afd1 = AFD.aparar(self, orcamento) if aparar else self
+        afd2 = AFD.aparar(other, orcamento) if aparar else other
 
-        estados, nomes_estados, alfabeto, transicoes, estado_inicial = AFD.produto(afd1, afd2)
+        estados, nomes_estados, alfabeto, transicoes, estado_inicial = AFD.produto(afd1, afd2, orcamento)
 
         # Definindo os estados finais para montar o AFD
         produto_estados_finais = set()
@@ -330,11 +820,16 @@ class AFD:
         # Retornando o AFD montado
         return AFD(nomes_estados, alfabeto, transicoes, estado_inicial, produto_estados_finais)
 
-    def uniao(self, other):
-        afd1 = AFD.copiar(self)
-        afd2 = AFD.copiar(other)
+    def uniao (self, other, aparar: bool = True, orcamento: Orcamento | None = None):
+        if orcamento is not None:
+            orcamento.etapa = "produto"
+
+        # Os operandos não são alterados (o produto trabalha sobre cópias completadas),
+        # então não é preciso copiá-los quando não são aparados
+        afd1 = AFD.aparar(self, orcamento) if aparar else self
+        afd2 = AFD.aparar(other, orcamento) if aparar else other
 
-        estados, nomes_estados, alfabeto, transicoes, estado_inicial = AFD.produto(afd1, afd2)
+        estados, nomes_estados, alfabeto, transicoes, estado_inicial = AFD.produto(afd1, afd2, orcamento)
 
         # Definindo os estados finais para montar o AFD
         produto_estados_finais = set()
@@ -353,10 +848,14 @@ class AFD:
         Função para testar a equivalência de dois autômatos, mais detalhes de como ela funciona
         estão nos comentários dentro da função.
     """
-    def testar_equivalencia (self, other):
-        # Copiando os AFDs para evitar interferências nos originais
-        afd1 = self.copiar()
-        afd2 = other.copiar()
+    def testar_equivalencia (self, other, aparar: bool = True, orcamento: Orcamento | None = None):
+        if orcamento is not None:
+            orcamento.etapa = "equivalencia"
+
+        # Se pedido, já retiramos os estados inúteis, que não mudam a linguagem aceita.
+        # Os AFDs não são alterados aqui, então não é preciso copiá-los.
+        afd1 = self.aparar(orcamento) if aparar else self
+        afd2 = other.aparar(orcamento) if aparar else other
 
         # Para ter a possibilidade de serem equivalentes, os
         # autômatos devem ter o mesmo alfabeto
@@ -375,34 +874,41 @@ class AFD:
         # autômatos NÃO são equivalentes se para um par {qa, qb}, um dos elementos
         # é um estado intermediário (não final) e o outro é um estado final.
         # Fonte: https://www.youtube.com/watch?v=nX4JrcHgpZY
-        estados_verificados = {}
-
-        e1 = afd1.estado_inicial
-        e2 = afd2.estado_inicial
-
-        # True = dupla já verificada; False = dupla ainda não verificada
-        estados_verificados[(e1, e2)] = False
-
-        while False in estados_verificados.values():
-            # Escolhendo a próxima dupla de estados dentro do dicionário
-            for (k1, k2), valor in estados_verificados.items():
-                if not valor:
-                    e1 = k1
-                    e2 = k2
+        # Como os alfabetos são iguais, basta olhar uma transição por classe de símbolos
+        # que se comportam da mesma forma nos dois autômatos
+        grupos = AFD.agrupar_classes(afd1.classes_de_simbolos(afd2, orcamento=orcamento))
+        tabela1 = afd1.transicoes_por_classe(grupos, orcamento).tabela
+        tabela2 = afd2.transicoes_por_classe(grupos, orcamento).tabela
+
+        # Os pares já encontrados ficam em um conjunto, e os que ainda não foram
+        # verificados ficam em uma pilha, então cada iteração escolhe o próximo par
+        # sem precisar varrer todos os pares já encontrados
+        par_inicial = (afd1.estado_inicial, afd2.estado_inicial)
+        pares_encontrados = {par_inicial}
+        pendentes = [par_inicial]
+
+        while pendentes:
+            # A verificação é feita a cada par, e não só quando um par novo é encontrado,
+            # para que o prazo e o progresso sejam checados até o fim da busca
+            if orcamento is not None:
+                orcamento.verificar()
+
+            e1, e2 = pendentes.pop()
 
             # Olhando as transições da dupla de estados para cada
-            # símbolo no alfabeto
-            for simbolo in afd1.alfabeto: # Como já foi verificado os dois alfabetos, tanto faz a utilização de qualquer um
-                t1 = afd1.transicoes.get((e1, simbolo))
-                t2 = afd2.transicoes.get((e2, simbolo))
+            # classe de símbolos do alfabeto
+            for id_classe in grupos:
+                t1 = tabela1.get((e1, id_classe))
+                t2 = tabela2.get((e2, id_classe))
 
                 if (t1 in afd1.estados_finais and t2 not in afd2.estados_finais) or (t1 not in afd1.estados_finais and t2 in afd2.estados_finais):
                     return False
 
-                if (t1, t2) not in estados_verificados.keys():
-                    estados_verificados[(t1, t2)] = False
-
-                estados_verificados[(e1, e2)] = True
+                if (t1, t2) not in pares_encontrados:
+                    pares_encontrados.add((t1, t2))
+                    pendentes.append((t1, t2))
+                    if orcamento is not None:
+                        orcamento.contar_pares()
 
         # Caso não for achado nenhum par de estados que satisfaça as condições de não equivalência, retornamos True
         return True
@@ -413,42 +919,124 @@ class AFD:
         minimização, uma vez que com ele é possível juntar os estados que fazem o mesmo serviço dentro do 
         autômato.
     """
-    def estados_equivalentes(self):
-        estados_alcancaveis = self.obter_estados_alcancaveis()
-        nao_equivalentes = self.encontrar_estados_nao_equivalentes(estados_alcancaveis)
-        grupos_equivalentes = self.agrupar_estados_equivalentes(estados_alcancaveis, nao_equivalentes)
+    def estados_equivalentes(self, orcamento: Orcamento | None = None, tabela_de_classes: TabelaDeClasses | None = None):
+        if orcamento is not None:
+            orcamento.etapa = "minimizacao"
+
+        # A tabela de classes de símbolos (veja transicoes_por_classe) pode ser passada já calculada
+        if tabela_de_classes is None:
+            tabela_de_classes = self.transicoes_por_classe(orcamento=orcamento)
+        estados_alcancaveis = self.obter_estados_alcancaveis(tabela_de_classes, orcamento)
+        nao_equivalentes = self.encontrar_estados_nao_equivalentes(estados_alcancaveis, tabela_de_classes, orcamento)
+        grupos_equivalentes = self.agrupar_estados_equivalentes(estados_alcancaveis, nao_equivalentes, orcamento)
 
         # O resultado dos grupos é uma lista de sets, então filtramos essa lista para que ela retorne
         # somente os sets que possuam mais de um elemento, ou seja, os grupos que possuam estados
         # equivalentes.
         return [s for s in grupos_equivalentes if len(s) > 1]
 
-    def obter_estados_alcancaveis (self):
+    def obter_estados_alcancaveis (self, tabela_de_classes: TabelaDeClasses | None = None, orcamento: Orcamento | None = None):
         # Se um estado não é alcançável a partir do estado inicial,
-        # ele não interfere no funcionamento do AFD, logo pode ser retirado
+        # ele não interfere no funcionamento do AFD, logo pode ser retirado.
+        # Se a tabela de classes de símbolos for passada, percorremos uma transição
+        # por classe, o que é suficiente para achar os mesmos estados.
+        if tabela_de_classes is None:
+            rotulos, transicoes = self.alfabeto, self.transicoes
+        else:
+            rotulos, transicoes = tabela_de_classes.grupos.keys(), tabela_de_classes.tabela
+
         alcancaveis = {self.estado_inicial}
         pilha = [self.estado_inicial]
 
+        # O orçamento é verificado a cada transição, e não a cada estado, já que com
+        # alfabetos grandes poucos estados já dão muito trabalho
         while pilha:
             estado = pilha.pop()
-            for simbolo in self.alfabeto:
-                if (estado, simbolo) in self.transicoes:
-                    proximo_estado = self.transicoes[(estado, simbolo)]
+            for rotulo in rotulos:
+                if orcamento is not None:
+                    orcamento.verificar()
+
+                if (estado, rotulo) in transicoes:
+                    proximo_estado = transicoes[(estado, rotulo)]
                     if proximo_estado not in alcancaveis:
                         alcancaveis.add(proximo_estado)
                         pilha.append(proximo_estado)
 
         return alcancaveis
 
-    def encontrar_estados_nao_equivalentes (self, alcancaveis):
+    """
+        Método para montar o índice reverso das transições, ou seja, um dicionário da forma
+        destino: {origens}. Com ele é possível percorrer o autômato "de trás para frente" sem
+        precisar varrer todas as transições a cada estado visitado.
+    """
+    def indice_reverso (self, orcamento: Orcamento | None = None):
+        indice = {}
+        for (origem, simbolo), destino in self.transicoes.items():
+            if orcamento is not None:
+                orcamento.verificar()
+
+            indice.setdefault(destino, set()).add(origem)
+
+        return indice
+
+    def obter_estados_coalcancaveis (self, orcamento: Orcamento | None = None):
+        # Um estado é co-alcançável se a partir dele é possível chegar em algum
+        # estado final. Para isso, percorremos o índice reverso partindo dos finais.
+        indice = self.indice_reverso(orcamento)
+        coalcancaveis = self.estados_finais & self.estados
+        pilha = list(coalcancaveis)
+
+        while pilha:
+            estado = pilha.pop()
+            for anterior in indice.get(estado, ()):
+                if orcamento is not None:
+                    orcamento.verificar()
+
+                if anterior not in coalcancaveis:
+                    coalcancaveis.add(anterior)
+                    pilha.append(anterior)
+
+        return coalcancaveis
+
+    """
+        Método para aparar (trim) o AFD: retira os estados que não são alcançáveis a partir do estado
+        inicial e os estados mortos, isto é, aqueles que não levam a nenhum estado final. Como uma
+        transição ausente já rejeita a cadeia, tirar esses estados não altera a linguagem aceita.
+        O estado inicial sempre é mantido, mesmo que o autômato não aceite nenhuma cadeia.
+    """
+    def aparar (self, orcamento: Orcamento | None = None):
+        uteis = self.obter_estados_alcancaveis(orcamento=orcamento) & self.obter_estados_coalcancaveis(orcamento)
+        uteis.add(self.estado_inicial)
+
+        transicoes = {}
+        for (origem, simbolo), destino in self.transicoes.items():
+            if orcamento is not None:
+                orcamento.verificar()
+
+            if origem in uteis and destino in uteis:
+                transicoes[(origem, simbolo)] = destino
+
+        return AFD(uteis, self.alfabeto, transicoes, self.estado_inicial, self.estados_finais & uteis)
+
+    def encontrar_estados_nao_equivalentes (self, alcancaveis, tabela_de_classes: TabelaDeClasses | None = None, orcamento: Orcamento | None = None):
         # Encontramos os estados distinguíveis, ou seja, os equivalentes,
         # usando o algoritmo de Myhill-Nerode. Fonte: https://www.youtube.com/watch?v=UiXkJUTkp44
+        # Símbolos da mesma classe levam aos mesmos estados, então basta uma transição por classe.
+        if tabela_de_classes is None:
+            tabela_de_classes = self.transicoes_por_classe()
+        grupos, tabela = tabela_de_classes.grupos, tabela_de_classes.tabela
         nao_equivalentes = set()
 
+        if orcamento is not None:
+            orcamento.etapa = "minimizacao"
+
         # Primeiro percorremos o conjunto de estados alcançáveis e adicionamos
         # aqueles que não são equivalentes logo de cara, ou seja: os finais e os
         # não finais
         for q1 in alcancaveis:
+            if orcamento is not None:
+                orcamento.verificar()
+
             for q2 in alcancaveis:
                 if q1 < q2: # Previne a duplicação (q1, q2) e (q2, q1)
                     if (q1 in self.estados_finais) != (q2 in self.estados_finais):
@@ -462,11 +1050,14 @@ class AFD:
             for q1 in alcancaveis:
                 for q2 in alcancaveis:
                     if q1 < q2 and (q1, q2) not in nao_equivalentes:
+                        if orcamento is not None:
+                            orcamento.contar_pares()
+
                         # Verificamos se são não equivalentes através de algum símbolo
-                        for simbolo in self.alfabeto:
+                        for id_classe in grupos:
                             # Obtendo os próximos estados após a transição
-                            prox1 = self.transicoes.get((q1, simbolo))
-                            prox2 = self.transicoes.get((q2, simbolo))
+                            prox1 = tabela.get((q1, id_classe))
+                            prox2 = tabela.get((q2, id_classe))
 
                             # Se um tem transição e o outro não, são não equivalentes
                             if (prox1 is None) != (prox2 is None):
@@ -486,7 +1077,7 @@ class AFD:
 
         return nao_equivalentes
 
-    def agrupar_estados_equivalentes (self, alcancaveis, nao_equivalentes):
+    def agrupar_estados_equivalentes (self, alcancaveis, nao_equivalentes, orcamento: Orcamento | None = None):
         # Primeiro, inicializamos cada estado no seu próprio grupo
         grupos = {}
         for estado in alcancaveis:
@@ -494,6 +1085,9 @@ class AFD:
 
         # Agora, unimos os estados equivalentes
         for q1 in alcancaveis:
+            if orcamento is not None:
+                orcamento.verificar()
+
             for q2 in alcancaveis:
                 if q1 != q2 and (min(q1, q2), max(q1, q2)) not in nao_equivalentes:
                     # Os estados q1 e q2 são equivalentes
@@ -520,7 +1114,7 @@ class AFD:
         # Retornando a lista de conjuntos de estados equivalentes
         return list(grupos.values())
 
-    def construir_afd_minimizado (self, grupos_equivalentes):
+    def construir_afd_minimizado (self, grupos_equivalentes, tabela_de_classes: TabelaDeClasses | None = None):
         # Com temos vários estados num grupo, escolhemos um para representar todos ao montar as transições e
         # os estados finais. Esse vai ser o representante e é o primeiro na lista ordenada dos estados no grupo de equivalentes.
         estado_para_representante = {}
@@ -532,14 +1126,18 @@ class AFD:
         # Criando os novos estados
         novos_estados = set(estado_para_representante.values())
 
-        # Criando as novas transições
+        # Criando as novas transições, uma vez por classe de símbolos
+        if tabela_de_classes is None:
+            tabela_de_classes = self.transicoes_por_classe()
+        grupos, tabela = tabela_de_classes.grupos, tabela_de_classes.tabela
         novas_transicoes = {}
         for estado in novos_estados:
-            for simbolo in self.alfabeto:
-                if (estado, simbolo) in self.transicoes:
-                    alvo = self.transicoes[(estado, simbolo)]
+            for id_classe, simbolos in grupos.items():
+                if (estado, id_classe) in tabela:
                     # Mapeando para o representante do grupo
-                    novas_transicoes[(estado, simbolo)] = estado_para_representante[alvo]
+                    alvo = estado_para_representante[tabela[(estado, id_classe)]]
+                    for simbolo in simbolos:
+                        novas_transicoes[(estado, simbolo)] = alvo
 
         # Por fim, colocando o novo estado inicial e os novos estados finais
         novo_estado_inicial = estado_para_representante[self.estado_inicial]
@@ -555,8 +1153,14 @@ class AFD:
         os estados que são equivalentes em seus próprios grupos, sendo um dos estados o representante do grupo.
         Por fim, montamos o AFD minimizado trocando cada estado pelo representante do grupo do qual faz parte.
     """
-    def minimizar (self):
-        estados_alcancaveis = self.obter_estados_alcancaveis()
-        nao_equivalentes = self.encontrar_estados_nao_equivalentes(estados_alcancaveis)
-        grupos_equivalentes = self.agrupar_estados_equivalentes(estados_alcancaveis, nao_equivalentes)
-        return self.construir_afd_minimizado(grupos_equivalentes)
\ No newline at end of file
+    def minimizar (self, orcamento: Orcamento | None = None, tabela_de_classes: TabelaDeClasses | None = None):
+        if orcamento is not None:
+            orcamento.etapa = "minimizacao"
+
+        # A tabela de classes de símbolos (veja transicoes_por_classe) pode ser passada já calculada
+        if tabela_de_classes is None:
+            tabela_de_classes = self.transicoes_por_classe(orcamento=orcamento)
+        estados_alcancaveis = self.obter_estados_alcancaveis(tabela_de_classes, orcamento)
+        nao_equivalentes = self.encontrar_estados_nao_equivalentes(estados_alcancaveis, tabela_de_classes, orcamento)
+        grupos_equivalentes = self.agrupar_estados_equivalentes(estados_alcancaveis, nao_equivalentes, orcamento)
+        return self.construir_afd_minimizado(grupos_equivalentes, tabela_de_classes)
\ No newline at end of file
@@ -0,0 +1,105 @@
+from afd import *
+from collections.abc import MutableMapping
+from datetime import datetime
+import json
+import os
+import uuid
+
+"""
+    Classe da área de trabalho: guarda em disco vários autômatos com nome, para que eles não se percam
+    ao fechar o programa. Ela funciona como um dicionário nome: AFD, então pode substituir o dicionário
+    de autômatos do main.py.
+
+    No diretório ficam um arquivo de índice (indice.json), com os metadados de cada autômato (tamanho,
+    operação de origem, arquivo de onde foi importado etc.), e um arquivo JSON por autômato com o seu
+    conteúdo. Ao abrir a área de trabalho só o índice é lido; o conteúdo de cada autômato é carregado
+    na primeira vez que ele é acessado e depois fica guardado em memória.
+"""
+class AreaDeTrabalho(MutableMapping):
+    INDICE = "indice.json"
+
+    def __init__(self, diretorio: str):
+        self.diretorio = diretorio
+        self.carregados: Dict[str, AFD] = {}
+
+        os.makedirs(self.diretorio, exist_ok=True)
+
+        caminho_indice = os.path.join(self.diretorio, self.INDICE)
+        if os.path.exists(caminho_indice):
+            with open(caminho_indice, 'r', encoding='utf-8') as f:
+                self.indice: Dict[str, Dict[str, Any]] = json.load(f)
+        else:
+            self.indice = {}
+
+    def __getitem__ (self, nome: str) -> AFD:
+        if nome not in self.carregados:
+            metadados = self.indice[nome] # KeyError se o autômato não existir
+            with open(os.path.join(self.diretorio, metadados["arquivo"]), 'r', encoding='utf-8') as f:
+                self.carregados[nome] = AFD.de_dicionario(json.load(f))
+
+        return self.carregados[nome]
+
+    def __setitem__ (self, nome: str, afd: AFD):
+        self.salvar(nome, afd)
+
+    def __delitem__ (self, nome: str):
+        metadados = self.indice.pop(nome)
+        self.carregados.pop(nome, None)
+        self.gravar_indice()
+
+        caminho = os.path.join(self.diretorio, metadados["arquivo"])
+        if os.path.exists(caminho):
+            os.remove(caminho)
+
+    def __iter__ (self):
+        return iter(self.indice)
+
+    def __len__ (self):
+        return len(self.indice)
+
+    def __contains__ (self, nome):
+        # Sobrescrito para não carregar o autômato só para saber se ele existe
+        return nome in self.indice
+
+    """
+        Método para salvar um autômato na área de trabalho junto com seus metadados. Se já existir um
+        autômato com o mesmo nome, ele é substituído, mantendo o arquivo de onde foi importado caso
+        nenhum outro seja informado. A origem não é mantida: o autômato novo pode ter vindo de outra
+        operação, então, se ela não for informada (como na atribuição automatos[nome] = afd), fica
+        como desconhecida (None).
+    """
+    def salvar (self, nome: str, afd: AFD, origem: str | None = None, arquivo_fonte: str | None = None):
+        anterior = self.indice.get(nome, {})
+        arquivo = anterior.get("arquivo", f"{uuid.uuid4().hex}.json")
+
+        self.gravar_json(arquivo, afd.para_dicionario())
+
+        self.indice[nome] = {
+            "arquivo": arquivo,
+            "estados": len(afd.estados),
+            "transicoes": len(afd.transicoes),
+            "origem": origem,
+            "arquivo_fonte": arquivo_fonte if arquivo_fonte is not None else anterior.get("arquivo_fonte"),
+            "atualizado_em": datetime.now().isoformat(timespec='seconds'),
+        }
+        self.carregados[nome] = afd
+        self.gravar_indice()
+
+    def metadados (self, nome: str) -> Dict[str, Any]:
+        return dict(self.indice[nome])
+
+    def gravar_indice (self):
+        self.gravar_json(self.INDICE, self.indice)
+
+    """
+        Os arquivos são escritos primeiro em um arquivo temporário e depois renomeados, para que um
+        programa interrompido no meio da escrita não deixe o índice ou um autômato corrompido.
+    """
+    def gravar_json (self, arquivo: str, dados):
+        caminho = os.path.join(self.diretorio, arquivo)
+        temporario = caminho + ".tmp"
+
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(dados, f, ensure_ascii=False, indent=4)
+
+        os.replace(temporario, caminho)
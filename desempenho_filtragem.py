@@ -0,0 +1,83 @@
+from afd import *
+import itertools
+import random
+import time
+
+"""
+    Benchmark da filtragem de listas de palavras: compara o tempo de validar cada palavra separadamente
+    (o laço com o método validar) com o método filtrar_palavras, tanto montando a trie na hora (filtragem
+    completa) quanto recebendo uma trie já montada (caso em que a mesma lista é filtrada várias vezes).
+"""
+
+def comparar_desempenho (afd: AFD, palavras: List[str], repeticoes: int = 5) -> Dict[str, float]:
+    esperado = sorted(palavra for palavra in palavras if afd.validar(palavra))
+    if sorted(afd.filtrar_palavras(palavras)) != esperado:
+        raise ValueError("A filtragem pela trie discorda do validar.")
+
+    def medir (funcao):
+        melhor = float("inf")
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            funcao()
+            melhor = min(melhor, time.perf_counter() - inicio)
+        return melhor
+
+    trie = Trie.montar(palavras)
+    estatisticas = {}
+    list(afd.filtrar_palavras(trie, estatisticas))
+
+    tempo_validar = medir(lambda: [palavra for palavra in palavras if afd.validar(palavra)])
+    tempo_montagem = medir(lambda: Trie.montar(palavras))
+    tempo_percurso = medir(lambda: list(afd.filtrar_palavras(trie)))
+    tempo_completo = medir(lambda: list(afd.filtrar_palavras(palavras)))
+
+    return {
+        "tempo_validar": tempo_validar,
+        "tempo_montagem": tempo_montagem,
+        "tempo_percurso": tempo_percurso,
+        "tempo_completo": tempo_completo,
+        "transicoes": estatisticas["transicoes"],
+        "transicoes_validar": estatisticas["transicoes_validar"],
+    }
+
+def imprimir (titulo: str, resultado: Dict[str, float]):
+    print(titulo)
+    print(f"    validar palavra por palavra:   {resultado['tempo_validar']:.4f} s")
+    print(f"    filtragem completa (com trie): {resultado['tempo_completo']:.4f} s "
+          f"({resultado['tempo_validar'] / resultado['tempo_completo']:.2f}x)")
+    print(f"    só o percurso (trie pronta):   {resultado['tempo_percurso']:.4f} s "
+          f"({resultado['tempo_validar'] / resultado['tempo_percurso']:.2f}x)")
+    print(f"    montagem da trie:              {resultado['tempo_montagem']:.4f} s")
+    print(f"    transições: {resultado['transicoes']} no percurso, {resultado['transicoes_validar']} no validar")
+
+"""
+    Três cenários: todas as palavras de 6 letras sobre "abcdefgh" (prefixos muito compartilhados) e URLs
+    longas com um prefixo comum curto e o resto aleatório (quase nada compartilhado), ambos com um AFD
+    aleatório e completo em que nenhum estado é morto; e as mesmas URLs com um AFD completo que só aceita
+    as que começam com um caminho dado, em que as outras caem no estado de erro.
+    Uso: python desempenho_filtragem.py
+"""
+if __name__ == '__main__':
+    aleatorio = random.Random(0)
+
+    def afd_aleatorio (alfabeto, quantidade_estados):
+        estados = [f"q{i}" for i in range(quantidade_estados)]
+        transicoes = {(estado, simbolo): aleatorio.choice(estados) for estado in estados for simbolo in alfabeto}
+        return AFD(estados, alfabeto, transicoes, estados[0], estados[::3])
+
+    alfabeto = "abcdefgh"
+    palavras = ["".join(p) for p in itertools.product(alfabeto, repeat=6)]
+    imprimir(f"{len(palavras)} palavras de 6 letras sobre {alfabeto}:", comparar_desempenho(afd_aleatorio(alfabeto, 20), palavras))
+
+    alfabeto_urls = "abcdefghijklmnopqrstuvwxyz0123456789/.:-_"
+    urls = ["https://exemplo.com/" + "".join(aleatorio.choice(alfabeto_urls) for _ in range(800)) for _ in range(3000)]
+    imprimir(f"{len(urls)} URLs de ~820 caracteres:", comparar_desempenho(afd_aleatorio(alfabeto_urls, 20), urls))
+
+    prefixo = "https://exemplo.com/api/"
+    urls_api = [prefixo + url[len(prefixo):] if i % 10 == 0 else url for i, url in enumerate(urls)]
+    estados = [f"p{i}" for i in range(len(prefixo) + 1)] + ["ERRO"]
+    transicoes = {(estado, simbolo): "ERRO" for estado in estados for simbolo in alfabeto_urls}
+    transicoes.update({(f"p{i}", simbolo): f"p{i + 1}" for i, simbolo in enumerate(prefixo)})
+    transicoes.update({(f"p{len(prefixo)}", simbolo): f"p{len(prefixo)}" for simbolo in alfabeto_urls})
+    afd_prefixo = AFD(estados, alfabeto_urls, transicoes, "p0", [f"p{len(prefixo)}"])
+    imprimir(f"{len(urls_api)} URLs, aceitas só as que começam com {prefixo}:", comparar_desempenho(afd_prefixo, urls_api))
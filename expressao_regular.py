@@ -0,0 +1,234 @@
+from afd import *
+import random
+import re
+import time
+
+"""
+    Módulo para converter um AFD em uma expressão regular do Python (módulo re), pelo método de
+    eliminação de estados. Validar uma cadeia com a expressão compilada pode ser mais rápido do que o
+    laço em Python do método validar, já que o re é feito em C, mas só enquanto a expressão é curta:
+    com expressões longas o re passa a testar muitas alternativas e fica mais lento que o validar.
+
+    Durante a eliminação, as expressões são guardadas como pares (texto, precedência), para que só se
+    coloquem parênteses quando necessário e a expressão final fique menor.
+"""
+
+# Precedências das expressões: quanto maior, mais "presa" a expressão está
+ALTERNATIVA = 1
+CONCATENACAO = 2
+FECHO = 3
+ATOMO = 4
+
+VAZIA = ("", ATOMO) # Expressão que aceita só a cadeia vazia
+NENHUMA = "(?!)" # Expressão que não aceita nenhuma cadeia
+
+LIMITE_PADRAO = 2000
+
+# Tamanho máximo da expressão para que ela seja considerada no lugar do validar. Em AFDs aleatórios de
+# 2 a 7 estados, a expressão foi mais rápida em mediana até uns 250 caracteres (2,7x até 50, 1,4x entre
+# 100 e 200) e mais lenta a partir de uns 300 (0,66x entre 500 e 1000)
+LIMITE_VALIDADOR = 250
+
+def agrupar (expressao, precedencia_minima):
+    texto, precedencia = expressao
+    if precedencia < precedencia_minima:
+        return f"(?:{texto})"
+    return texto
+
+def uniao (r1, r2):
+    if r1 is None:
+        return r2
+    if r2 is None or r1 == r2:
+        return r1
+
+    # União com a cadeia vazia vira um "?" (opcional)
+    if r1 == VAZIA or r2 == VAZIA:
+        outra = r2 if r1 == VAZIA else r1
+        if outra[1] == FECHO and outra[0].endswith("*"):
+            return outra # r* já aceita a cadeia vazia
+        return (agrupar(outra, ATOMO) + "?", FECHO)
+
+    return (f"{r1[0]}|{r2[0]}", ALTERNATIVA)
+
+def concatenar (*expressoes):
+    partes = [agrupar(r, CONCATENACAO) for r in expressoes if r != VAZIA]
+    if not partes:
+        return VAZIA
+    if len(partes) == 1:
+        return next(r for r in expressoes if r != VAZIA)
+    return ("".join(partes), CONCATENACAO)
+
+def fecho (expressao):
+    if expressao is None or expressao == VAZIA:
+        return VAZIA
+    if expressao[0].endswith("*") and expressao[1] == FECHO:
+        return expressao # (r*)* = r*
+    return (agrupar(expressao, ATOMO) + "*", FECHO)
+
+"""
+    Monta a expressão de um conjunto de símbolos de um caractere, usando classes como [a-cx] quando
+    há mais de um símbolo. Os intervalos vêm do mesmo método usado nas classes de símbolos do AFD.
+"""
+def expressao_dos_simbolos (simbolos):
+    simbolos = sorted(simbolos)
+    if len(simbolos) == 1:
+        return (re.escape(simbolos[0]), ATOMO)
+
+    partes = []
+    for inicio, fim in AFD.intervalos_de_simbolos(simbolos):
+        if inicio == fim:
+            partes.append(re.escape(inicio))
+        elif ord(fim) == ord(inicio) + 1:
+            partes.append(re.escape(inicio) + re.escape(fim))
+        else:
+            partes.append(f"{re.escape(inicio)}-{re.escape(fim)}")
+
+    return (f"[{''.join(partes)}]", ATOMO)
+
+"""
+    Função que gera a expressão regular equivalente ao AFD. Primeiro o autômato é aparado, já que estados
+    inúteis só aumentariam a expressão. Depois, cria-se um estado inicial e um final novos, ligados por
+    transições vazias ao estado inicial e aos estados finais do AFD, e os estados originais são eliminados
+    um a um: ao eliminar k, cada caminho p -> k -> q vira uma aresta p -> q rotulada por
+    R(p,k) R(k,k)* R(k,q), unida ao rótulo que já existia entre p e q.
+
+    A ordem de eliminação é escolhida a cada passo: primeiro o estado com menos pares (entrada, saída),
+    desempatando pelo tamanho dos rótulos, o que costuma deixar a expressão menor. Se algum rótulo passar
+    do limite, a conversão é abandonada e a função retorna None.
+
+    Como o validar lê a cadeia caractere por caractere, transições com símbolos de mais de um caractere
+    nunca são usadas por ele, então elas também são ignoradas aqui.
+"""
+def para_expressao_regular (afd: AFD, limite: int | None = LIMITE_PADRAO) -> str | None:
+    aparado = afd.aparar()
+    if not aparado.estados_finais:
+        return NENHUMA
+
+    inicio = object()
+    fim = object()
+
+    # saida[p][q] e entrada[q][p] guardam o rótulo da aresta p -> q
+    saida = {estado: {} for estado in aparado.estados}
+    entrada = {estado: {} for estado in aparado.estados}
+    saida[inicio] = {}
+    entrada[fim] = {}
+
+    simbolos_da_aresta = {}
+    for (origem, simbolo), destino in aparado.transicoes.items():
+        if len(simbolo) == 1:
+            simbolos_da_aresta.setdefault((origem, destino), []).append(simbolo)
+
+    for (origem, destino), simbolos in simbolos_da_aresta.items():
+        saida[origem][destino] = entrada[destino][origem] = expressao_dos_simbolos(simbolos)
+
+    saida[inicio][aparado.estado_inicial] = entrada[aparado.estado_inicial][inicio] = VAZIA
+    for estado in aparado.estados_finais:
+        saida[estado][fim] = entrada[fim][estado] = VAZIA
+
+    def custo (estado):
+        pares = len([p for p in entrada[estado] if p != estado]) * len([q for q in saida[estado] if q != estado])
+        tamanho = sum(len(r[0]) for r in entrada[estado].values()) + sum(len(r[0]) for r in saida[estado].values())
+        return pares, tamanho
+
+    restantes = set(aparado.estados)
+    while restantes:
+        k = min(restantes, key=lambda estado: (custo(estado), estado))
+        restantes.remove(k)
+
+        laco = fecho(saida[k].pop(k, None))
+        entrada[k].pop(k, None)
+
+        for p, r_pk in entrada[k].items():
+            for q, r_kq in saida[k].items():
+                novo = uniao(saida[p].get(q), concatenar(r_pk, laco, r_kq))
+                if limite is not None and len(novo[0]) > limite:
+                    return None
+                saida[p][q] = entrada[q][p] = novo
+
+        for p in entrada[k]:
+            del saida[p][k]
+        for q in saida[k]:
+            del entrada[q][k]
+        del entrada[k], saida[k]
+
+    resultado = saida[inicio].get(fim)
+    return NENHUMA if resultado is None else resultado[0]
+
+"""
+    Função para gerar cadeias de teste para o AFD. Metade das cadeias é gerada andando aleatoriamente
+    pelas transições do AFD (para que boa parte seja aceita), e a outra metade é sorteada no alfabeto,
+    com alguns caracteres de fora dele.
+"""
+def gerar_cadeias (afd: AFD, quantidade: int = 500, comprimento_maximo: int = 20, semente: int | None = None) -> List[str]:
+    aleatorio = random.Random(semente)
+    alfabeto = sorted(simbolo for simbolo in afd.alfabeto if len(simbolo) == 1) or ["a"]
+    sorteio = alfabeto + ["\n", "\u0000", "ç"]
+
+    saidas = {}
+    for (origem, simbolo), destino in afd.transicoes.items():
+        saidas.setdefault(origem, []).append(simbolo)
+
+    cadeias = []
+    for i in range(quantidade):
+        comprimento = aleatorio.randint(0, comprimento_maximo)
+
+        if i % 2 == 0:
+            estado = afd.estado_inicial
+            cadeia = []
+            while len(cadeia) < comprimento and saidas.get(estado):
+                simbolo = aleatorio.choice(saidas[estado])
+                cadeia.append(simbolo)
+                estado = afd.transicoes[(estado, simbolo)]
+            cadeias.append("".join(cadeia))
+        else:
+            cadeias.append("".join(aleatorio.choice(sorteio) for _ in range(comprimento)))
+
+    return cadeias
+
+"""
+    Função para conferir se a expressão compilada se comporta igual ao validar nas cadeias de teste.
+"""
+def verificar_expressao (afd: AFD, padrao: re.Pattern, quantidade: int = 500, comprimento_maximo: int = 20, semente: int | None = None) -> bool:
+    for cadeia in gerar_cadeias(afd, quantidade, comprimento_maximo, semente):
+        if (padrao.fullmatch(cadeia) is not None) != afd.validar(cadeia):
+            return False
+
+    return True
+
+def compilar (afd: AFD, limite: int | None = LIMITE_PADRAO) -> re.Pattern | None:
+    expressao = para_expressao_regular(afd, limite)
+    if expressao is None:
+        return None
+    return re.compile(expressao)
+
+"""
+    Função que escolhe automaticamente como validar cadeias no AFD. A expressão regular só é considerada
+    se ficar abaixo do limite de tamanho e se comportar igual ao validar nas cadeias de teste. Mesmo assim,
+    como o tempo do re depende da forma da expressão e não só do tamanho, os dois são cronometrados na
+    amostra (as cadeias de teste, se nenhuma for passada) e fica o mais rápido.
+
+    A escolha custa bem mais do que validar uma cadeia, então ela só compensa quando o mesmo validador é
+    usado em muitas cadeias. Por isso a opção 13 do menu, que valida uma cadeia só, usa o validar direto.
+"""
+def escolher_validador (afd: AFD, limite: int | None = LIMITE_VALIDADOR, amostra: Iterable[str] | None = None, repeticoes: int = 3) -> Callable[[str], bool]:
+    padrao = compilar(afd, limite)
+    if padrao is None:
+        return afd.validar
+
+    cadeias = gerar_cadeias(afd)
+    if any((padrao.fullmatch(cadeia) is not None) != afd.validar(cadeia) for cadeia in cadeias):
+        return afd.validar
+
+    expressao = lambda cadeia: padrao.fullmatch(cadeia) is not None
+    amostra = cadeias if amostra is None else list(amostra)
+
+    def medir (validar):
+        melhor = float("inf")
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            for cadeia in amostra:
+                validar(cadeia)
+            melhor = min(melhor, time.perf_counter() - inicio)
+        return melhor
+
+    return expressao if medir(expressao) < medir(afd.validar) else afd.validar
@@ -0,0 +1,188 @@
+from afd import *
+import hashlib
+import importlib.util
+import json
+import os
+import random
+import time
+
+"""
+    Módulo para gerar, a partir de um AFD, uma função de validação em Python feita só para ele. No validar
+    genérico, cada caractere custa montar a tupla (estado, símbolo), buscá-la no dicionário de transições
+    e comparar o resultado com None. Na função gerada, cada estado vira um dicionário símbolo: próximo
+    estado, em que o "próximo estado" já é o dicionário do destino, então cada caractere custa uma única
+    busca. Os estados finais são marcados com a chave "" (que nunca é um caractere da cadeia), e a falta
+    de transição é tratada com uma única exceção KeyError, fora do laço.
+
+    O código gerado é salvo como um módulo em um diretório de cache, com o nome dado por um hash
+    estrutural do autômato. Assim, outros processos (e o próprio Python, com o __pycache__) reaproveitam
+    o módulo já gerado sem precisar montá-lo de novo.
+"""
+
+# Deve ser alterada sempre que o código gerado mudar, para invalidar o cache
+VERSAO_GERADOR = 1
+
+carregados: Dict[str, Callable[[str], bool]] = {}
+
+def diretorio_cache () -> str:
+    return os.environ.get("AFD_CACHE_CODIGO", os.path.join(os.path.expanduser("~"), ".afd", "cache"))
+
+"""
+    Função para renumerar os estados úteis do AFD em ordem de busca em largura a partir do estado inicial,
+    percorrendo os símbolos em ordem. Autômatos iguais a menos do nome dos estados (ou de estados inúteis)
+    ficam com a mesma numeração e, portanto, com o mesmo hash e o mesmo código gerado. Só os símbolos de
+    um caractere são considerados, já que o validar lê a cadeia caractere por caractere.
+"""
+def forma_canonica (afd: AFD) -> Tuple[List[Dict[str, int]], List[int]]:
+    aparado = afd.aparar()
+
+    saidas = {}
+    for (origem, simbolo), destino in aparado.transicoes.items():
+        if len(simbolo) == 1:
+            saidas.setdefault(origem, []).append((simbolo, destino))
+
+    numero = {aparado.estado_inicial: 0}
+    fila = [aparado.estado_inicial]
+    tabela = []
+    for estado in fila: # A fila cresce durante o laço
+        linha = {}
+        for simbolo, destino in sorted(saidas.get(estado, [])):
+            if destino not in numero:
+                numero[destino] = len(numero)
+                fila.append(destino)
+            linha[simbolo] = numero[destino]
+        tabela.append(linha)
+
+    finais = sorted(numero[estado] for estado in aparado.estados_finais if estado in numero)
+    return tabela, finais
+
+def hash_estrutural (afd: AFD) -> str:
+    tabela, finais = forma_canonica(afd)
+    dados = json.dumps([VERSAO_GERADOR, tabela, finais], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(dados.encode("utf-8")).hexdigest()
+
+def gerar_codigo (afd: AFD) -> str:
+    tabela, finais = forma_canonica(afd)
+
+    linhas = [
+        f"# Módulo gerado automaticamente a partir de um AFD ({len(tabela)} estados). Não edite.",
+        "",
+    ]
+
+    # Primeiro criamos os dicionários vazios (ou só com a marca de final), já que as
+    # transições podem apontar para estados que ainda não foram criados
+    for i in range(len(tabela)):
+        linhas.append(f"E{i} = {{'': True}}" if i in finais else f"E{i} = {{}}")
+
+    linhas.append("")
+    for i, linha in enumerate(tabela):
+        if linha:
+            itens = ", ".join(f"{simbolo!r}: E{destino}" for simbolo, destino in linha.items())
+            linhas.append(f"E{i}.update({{{itens}}})")
+
+    linhas += [
+        "",
+        "def validar (cadeia):",
+        "    estado = E0",
+        "    try:",
+        "        for simbolo in cadeia:",
+        "            estado = estado[simbolo]",
+        "    except KeyError: # Não há transição",
+        "        return False",
+        "",
+        "    return '' in estado",
+        "",
+    ]
+
+    return "\n".join(linhas)
+
+"""
+    Função que devolve a função de validação gerada para o AFD. Ela é procurada primeiro em memória,
+    depois no diretório de cache e, se não existir, o módulo é gerado, salvo e importado. O arquivo é
+    escrito em um temporário e renomeado, para que dois processos gerando o mesmo módulo não deixem um
+    arquivo pela metade.
+"""
+def compilar_validador (afd: AFD, diretorio: str | None = None) -> Callable[[str], bool]:
+    chave = hash_estrutural(afd)
+    if chave in carregados:
+        return carregados[chave]
+
+    diretorio = diretorio_cache() if diretorio is None else diretorio
+    os.makedirs(diretorio, exist_ok=True)
+
+    nome_modulo = f"afd_{chave[:32]}"
+    caminho = os.path.join(diretorio, f"{nome_modulo}.py")
+
+    if not os.path.exists(caminho):
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            f.write(gerar_codigo(afd))
+        os.replace(temporario, caminho)
+
+    especificacao = importlib.util.spec_from_file_location(nome_modulo, caminho)
+    modulo = importlib.util.module_from_spec(especificacao)
+    especificacao.loader.exec_module(modulo)
+
+    carregados[chave] = modulo.validar
+    return modulo.validar
+
+"""
+    Função para comparar o desempenho da função gerada com o método validar do AFD. Ela confere se os
+    dois dão o mesmo resultado para todas as cadeias e retorna o tempo de cada um (o menor entre as
+    repetições) e quantos caracteres por segundo cada um processa.
+"""
+def comparar_desempenho (afd: AFD, cadeias: List[str], repeticoes: int = 5, diretorio: str | None = None) -> Dict[str, float]:
+    gerada = compilar_validador(afd, diretorio)
+
+    for cadeia in cadeias:
+        if gerada(cadeia) != afd.validar(cadeia):
+            raise ValueError(f"A função gerada discorda do validar na cadeia {cadeia!r}.")
+
+    def medir (validar):
+        melhor = float("inf")
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            for cadeia in cadeias:
+                validar(cadeia)
+            melhor = min(melhor, time.perf_counter() - inicio)
+        return melhor
+
+    caracteres = sum(len(cadeia) for cadeia in cadeias)
+    tempo_validar = medir(afd.validar)
+    tempo_gerada = medir(gerada)
+
+    return {
+        "tempo_validar": tempo_validar,
+        "tempo_gerada": tempo_gerada,
+        "caracteres_por_segundo_validar": caracteres / tempo_validar,
+        "caracteres_por_segundo_gerada": caracteres / tempo_gerada,
+        "aceleracao": tempo_validar / tempo_gerada,
+    }
+
+"""
+    Benchmark: gera um AFD aleatório completo e cadeias aleatórias no seu alfabeto (como o AFD é completo,
+    todas são lidas até o fim) e compara a função gerada com o validar.
+    Uso: python geracao_de_codigo.py [estados] [cadeias] [comprimento]
+"""
+if __name__ == '__main__':
+    import sys
+    import tempfile
+
+    quantidade_estados = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    quantidade_cadeias = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    comprimento = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+
+    aleatorio = random.Random(0)
+    alfabeto = "abcdefghij"
+    estados = [f"q{i}" for i in range(quantidade_estados)]
+    transicoes = {(estado, simbolo): aleatorio.choice(estados) for estado in estados for simbolo in alfabeto}
+    afd = AFD(estados, alfabeto, transicoes, estados[0], estados[::3])
+
+    cadeias = ["".join(aleatorio.choice(alfabeto) for _ in range(comprimento)) for _ in range(quantidade_cadeias)]
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        resultado = comparar_desempenho(afd, cadeias, diretorio=diretorio)
+
+    print(f"validar:         {resultado['tempo_validar']:.4f} s ({resultado['caracteres_por_segundo_validar']:,.0f} caracteres/s)")
+    print(f"função gerada:   {resultado['tempo_gerada']:.4f} s ({resultado['caracteres_por_segundo_gerada']:,.0f} caracteres/s)")
+    print(f"aceleração:      {resultado['aceleracao']:.2f}x")
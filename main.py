@@ -1,4 +1,6 @@
 from afd import *
+from area_de_trabalho import AreaDeTrabalho
+import expressao_regular
 from tkinter import Tk
 from tkinter.filedialog import askopenfilename, asksaveasfilename
 import os
@@ -18,9 +20,12 @@ def print_menu ():
     print("11. Visualizar AFD")
     print("12. Fazer cópia do AFD")
     print("13. Validar cadeia de caracteres")
+    print("14. Filtrar lista de palavras de um arquivo")
+    print("15. Remover AFD da área de trabalho")
+    print("16. Gerar expressão regular do AFD")
     print("0. Sair")
 
-def solicitar_um_automato (automatos: dict) -> str | None:
+def solicitar_um_automato (automatos: AreaDeTrabalho) -> str | None:
     if len(automatos) == 0:
         print("Nenhum autômato importado.")
         return None
@@ -32,7 +37,7 @@ def solicitar_um_automato (automatos: dict) -> str | None:
 
     return nome
 
-def solicitar_dois_automatos (automatos: dict) -> tuple[str, str] | None:
+def solicitar_dois_automatos (automatos: AreaDeTrabalho) -> tuple[str, str] | None:
     if len(automatos) < 2:
         print("É necessário no mínimo 2 AFDs para realizar essa opção.")
         return None
@@ -49,9 +54,17 @@ def solicitar_dois_automatos (automatos: dict) -> tuple[str, str] | None:
 
     return nome1, nome2
 
+"""
+    Os autômatos ficam salvos em disco na área de trabalho, então continuam disponíveis nas próximas
+    execuções. O diretório pode ser escolhido pela variável de ambiente AFD_AREA_DE_TRABALHO.
+"""
+def diretorio_area_de_trabalho () -> str:
+    return os.environ.get("AFD_AREA_DE_TRABALHO", os.path.join(os.path.expanduser("~"), ".afd"))
+
 def main():
     try:
-        automatos: Dict[str, AFD] = {}
+        automatos = AreaDeTrabalho(diretorio_area_de_trabalho())
+        ultima_trie: tuple[str, float, Trie] | None = None
 
         root = Tk()
         root.wm_attributes("-topmost", 1)
@@ -79,7 +92,7 @@ def main():
                         continue
 
                     nome = input(f"Digite o nome do autômato ({arquivo}): ")
-                    automatos[nome] = afd
+                    automatos.salvar(nome, afd, origem="importacao", arquivo_fonte=arquivo)
                     print(f"Arquivo importado com sucesso. Seu nome é {nome}")
 
                 case 2:
@@ -116,7 +129,9 @@ def main():
                         Caso o autômato não possua nenhum estado equivalente, significa que ele já está minimizado.
                         Se houvesse um ou mais estados equivalentes, eles poderiam ser condensados em um só.
                     """
-                    estados_equivalentes = AFD.estados_equivalentes(automatos[nome])
+                    # As classes de símbolos são calculadas uma vez e usadas nas duas etapas
+                    tabela_de_classes = AFD.transicoes_por_classe(automatos[nome])
+                    estados_equivalentes = AFD.estados_equivalentes(automatos[nome], tabela_de_classes=tabela_de_classes)
 
                     if len(estados_equivalentes) == 0:
                         print("O autômato já está em sua forma mínima.")
@@ -125,13 +140,13 @@ def main():
                     salvar_novo = input("O autômato a ser minimizado deve ser salvo como novo autômato? (S/N) ")
 
                     if salvar_novo == 'S' or salvar_novo == 's':
-                        afd = AFD.minimizar(automatos[nome])
+                        afd = AFD.minimizar(automatos[nome], tabela_de_classes=tabela_de_classes)
                         novo_nome = f"{nome}-min"
-                        automatos[novo_nome] = afd
+                        automatos.salvar(novo_nome, afd, origem="minimizacao")
                         print(f"Autômato minimizado com sucesso e salvo com o nome \"{novo_nome}\".")
 
                     elif salvar_novo == 'N' or salvar_novo == 'n':
-                        automatos[nome] = AFD.minimizar(automatos[nome])
+                        automatos.salvar(nome, AFD.minimizar(automatos[nome], tabela_de_classes=tabela_de_classes), origem="minimizacao")
                         print(f"Autômato foi minimizado e substituiu o original.")
 
                 case 4 | 5 | 6:
@@ -144,17 +159,17 @@ def main():
                     if opcao == 4:  # União de AFDs
                         nome_uniao = f"{nome1}-uni-{nome2}"
                         afd = AFD.uniao(automatos[nome1], automatos[nome2])
-                        automatos[nome_uniao] = afd
+                        automatos.salvar(nome_uniao, afd, origem="uniao")
                         print(f"Autômato salvo com sucesso com o nome \"{nome_uniao}\".")
                     elif opcao == 5:  # Intersecao de AFDs
                         nome_int = f"{nome1}-int-{nome2}"
                         afd = AFD.intersecao(automatos[nome1], automatos[nome2])
-                        automatos[nome_int] = afd
+                        automatos.salvar(nome_int, afd, origem="intersecao")
                         print(f"Autômato salvo com sucesso com o nome \"{nome_int}\".")
                     elif opcao == 6:  # Diferença de AFDs
                         nome_dif = f"{nome1}-dif-{nome2}"
                         afd = AFD.diferenca(automatos[nome1], automatos[nome2])
-                        automatos[nome_dif] = afd
+                        automatos.salvar(nome_dif, afd, origem="diferenca")
                         print(f"Autômato salvo com sucesso com o nome \"{nome_dif}\".")
 
                 case 7:
@@ -169,11 +184,11 @@ def main():
                     if salvar_novo == 'S' or salvar_novo == 's':
                         afd = AFD.complemento(automatos[nome])
                         novo_nome = f"{nome}-comp"
-                        automatos[novo_nome] = afd
+                        automatos.salvar(novo_nome, afd, origem="complemento")
                         print(f"Autômato complementado com sucesso e salvo com o nome \"{novo_nome}\".")
 
                     elif salvar_novo == 'N' or salvar_novo == 'n':
-                        automatos[nome] = AFD.complemento(automatos[nome])
+                        automatos.salvar(nome, AFD.complemento(automatos[nome]), origem="complemento")
                         print(f"Autômato complementado e substituiu o original.")
 
                 case 8:
@@ -210,9 +225,12 @@ def main():
                         print("Nenhum AFD disponível.")
                         continue
 
+                    # Só o índice é consultado, sem carregar os autômatos
                     id_afd: int = 1
-                    for nome, afd in automatos.items():
-                        print(f"{id_afd}. {nome}")
+                    for nome in automatos:
+                        metadados = automatos.metadados(nome)
+                        origem = metadados["origem"] or "desconhecida"
+                        print(f"{id_afd}. {nome} ({metadados['estados']} estados, origem: {origem})")
                         id_afd += 1
 
                 case 11:
@@ -234,7 +252,7 @@ def main():
                     afd = AFD.copiar(automatos[nome])
 
                     novo_nome = f"{nome}-copia"
-                    automatos[novo_nome] = afd
+                    automatos.salvar(novo_nome, afd, origem="copia", arquivo_fonte=automatos.metadados(nome)["arquivo_fonte"])
                     print(f"AFD copiado com sucesso. Está salvo com o nome \"{novo_nome}\".")
 
                 case 13:
@@ -250,6 +268,61 @@ def main():
 
                     print(f"A cadeia de caracteres {cadeia} {'é aceita.' if resultado else 'não é aceita.'}")
 
+                case 14:
+                    res = solicitar_um_automato(automatos)
+                    if res is None:
+                        continue
+
+                    nome = res
+
+                    arquivo = askopenfilename(title="Selecione um arquivo com uma palavra por linha")
+                    if arquivo == "":
+                        print("Nenhum arquivo escolhido. Operação cancelada.")
+                        continue
+
+                    # A trie do último arquivo é reaproveitada enquanto ele não for modificado,
+                    # já que montá-la custa mais do que percorrê-la
+                    modificado = os.path.getmtime(arquivo)
+                    if ultima_trie is None or ultima_trie[:2] != (arquivo, modificado):
+                        with open(arquivo, 'r', encoding='utf-8') as f:
+                            ultima_trie = (arquivo, modificado, Trie.montar(linha.rstrip('\n') for linha in f))
+
+                    trie = ultima_trie[2]
+                    estatisticas = {}
+                    aceitas = list(AFD.filtrar_palavras(automatos[nome], trie, estatisticas))
+
+                    for palavra in aceitas:
+                        print(palavra)
+
+                    print(f"\n{len(aceitas)} de {trie.palavras} palavras aceitas.")
+                    print(f"Transições feitas: {estatisticas['transicoes']} "
+                          f"(a validação palavra por palavra faria {estatisticas['transicoes_validar']}, "
+                          f"{estatisticas['transicoes_evitadas']} evitadas).")
+
+                case 15:
+                    res = solicitar_um_automato(automatos)
+                    if res is None:
+                        continue
+
+                    nome = res
+
+                    del automatos[nome]
+                    print(f"AFD \"{nome}\" removido da área de trabalho.")
+
+                case 16:
+                    res = solicitar_um_automato(automatos)
+                    if res is None:
+                        continue
+
+                    nome = res
+
+                    expressao = expressao_regular.para_expressao_regular(automatos[nome])
+
+                    if expressao is None:
+                        print(f"A expressão regular passou do limite de {expressao_regular.LIMITE_PADRAO} caracteres.")
+                    else:
+                        print(f"Expressão regular equivalente: {expressao}")
+
                 case _:
                     print("Opção inválida!")
 